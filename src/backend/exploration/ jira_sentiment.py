@@ -1,26 +1,70 @@
 import argparse
+import functools
 import os
+import re
 import sys
 import time
 import math
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from importlib import metadata
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
+import orjson
 import requests
-from dateutil import parser as date_parser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
+from vader_support import parse_iso_datetime, persisted_polarity_scores, split_text
+
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class JiraClient:
-    def __init__(self, base_url: str, email: str, api_token: str, api_version: str = "2", timeout_seconds: int = 20):
+    def __init__(
+        self,
+        base_url: str,
+        email: str,
+        api_token: str,
+        api_version: str = "2",
+        timeout_seconds: int = 20,
+        http_cache: Optional[str] = None,
+    ):
         self.base_url = base_url.rstrip("/")
-        self.session = requests.Session()
+        if http_cache:
+            self.session = self._cached_session(http_cache)
+        else:
+            self.session = requests.Session()
         self.session.auth = (email, api_token)
+        # Size the pool for the concurrent per-issue fetches in gather_data
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({"Accept": "application/json"})
         self.api_version = api_version
         self.timeout_seconds = timeout_seconds
 
+    @staticmethod
+    def _cached_session(http_cache: str) -> requests.Session:
+        try:
+            import requests_cache
+        except ImportError:
+            print("Warning: JIRA_HTTP_CACHE is set but requests-cache is not installed; caching disabled", file=sys.stderr)
+            return requests.Session()
+        # Optional on-disk GET cache. Jira sends Cache-Control: no-store, so ignore it and
+        # let expire_after decide; stale entries are revalidated with ETag/Last-Modified
+        return requests_cache.CachedSession(
+            cache_name=os.path.expanduser(http_cache),
+            backend="sqlite",
+            expire_after=timedelta(hours=1),
+            cache_control=False,
+            allowable_methods=("GET",),
+        )
+
     def _api(self, path: str) -> str:
         return f"{self.base_url}/rest/api/{self.api_version}{path}"
 
@@ -33,7 +77,7 @@ class JiraClient:
             raise RuntimeError("Forbidden (403). Check permissions and project access.")
         if not resp.ok:
             raise RuntimeError(f"Jira GET {url} failed: {resp.status_code} {resp.text}")
-        return resp.json()
+        return orjson.loads(resp.content)
 
     def search_issues(self, jql: str, fields: Optional[List[str]] = None, limit: int = 50, start_at: int = 0) -> Dict:
         params = {
@@ -45,6 +89,19 @@ class JiraClient:
             params["fields"] = ",".join(fields)
         return self.get("/search", params=params)
 
+    def search_issues_paged(self, jql: str, fields: Optional[List[str]] = None, limit: int = 1000, page_size: int = 100) -> List[Dict]:
+        # Walk /search pages until Jira reports no more results (or limit is hit)
+        issues: List[Dict] = []
+        start_at = 0
+        while len(issues) < limit:
+            data = self.search_issues(jql, fields=fields, limit=min(page_size, limit - len(issues)), start_at=start_at)
+            page = data.get("issues", [])
+            issues.extend(page)
+            start_at = data.get("startAt", start_at) + len(page)
+            if not page or data.get("isLast") or start_at >= data.get("total", 0):
+                break
+        return issues
+
     def get_issue(self, key: str, fields: Optional[List[str]] = None) -> Dict:
         params = {}
         if fields:
@@ -55,31 +112,38 @@ class JiraClient:
         # Paginate comments (Jira defaults to 50)
         comments: List[Dict] = []
         start_at = 0
-        while True:
-            data = self.get(f"/issue/{key}/comment", params={"startAt": start_at, "maxResults": min(100, limit - start_at)})
+        while len(comments) < limit:
+            data = self.get(f"/issue/{key}/comment", params={"startAt": start_at, "maxResults": min(100, limit - len(comments))})
             values = data.get("comments", []) or data.get("value", []) or []
             comments.extend(values)
-            if len(comments) >= limit or start_at + data.get("maxResults", 0) >= data.get("total", 0):
+            # Advance by what the server actually returned; it may cap maxResults below our request
+            start_at = data.get("startAt", start_at) + len(values)
+            if not values or data.get("isLast") or start_at >= data.get("total", 0):
                 break
-            start_at += data.get("maxResults", 0)
-        return comments
+        return comments[:limit]
 
     def get_fields(self) -> List[Dict]:
         return self.get("/field")
 
 
-def find_field_id(fields: List[Dict], target_names: List[str]) -> Optional[str]:
-    target_lower = {n.lower() for n in target_names}
+def index_fields_by_name(fields: List[Dict]) -> Dict[str, str]:
+    # Lowercase name -> id, first definition wins; built once per run from /field
+    by_name: Dict[str, str] = {}
     for f in fields:
-        name = str(f.get("name", "")).lower()
-        if name in target_lower:
-            return f.get("id")
+        by_name.setdefault(str(f.get("name", "")).lower(), f.get("id"))
+    return by_name
+
+
+def find_field_id(fields_by_name: Dict[str, str], target_names: List[str]) -> Optional[str]:
+    target_lower = [n.lower() for n in target_names]
+    for target in target_lower:
+        if target in fields_by_name:
+            return fields_by_name[target]
     # Fuzzy contains
-    for f in fields:
-        name = str(f.get("name", "")).lower()
+    for name, fid in fields_by_name.items():
         for target in target_lower:
             if target in name:
-                return f.get("id")
+                return fid
     return None
 
 
@@ -93,16 +157,69 @@ def load_config() -> Tuple[str, str, str, str]:
     return base_url, email, token, api_version
 
 
-def iso_to_dt(s: str) -> datetime:
-    return date_parser.isoparse(s)
-
-
 def within_last_days(dt: datetime, days: int, now: Optional[datetime] = None) -> bool:
     if now is None:
         now = datetime.now(timezone.utc)
     return dt >= now - timedelta(days=days)
 
 
+try:
+    VADER_VERSION = metadata.version("vaderSentiment")
+except metadata.PackageNotFoundError:
+    VADER_VERSION = "unknown"
+# Namespaced so rows never collide with sentiment_exec_summary.py's nltk scores in the shared cache
+SCORE_CACHE_VERSION = f"vaderSentiment-{VADER_VERSION}"
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_compound(analyzer: SentimentIntensityAnalyzer, text: str) -> float:
+    # Identical texts are scored once per run, and once per VADER version when the disk cache is on
+    return persisted_polarity_scores(SCORE_CACHE_VERSION, text, analyzer.polarity_scores).get("compound", 0.0)
+
+
+def compound_score(analyzer: SentimentIntensityAnalyzer, text: str) -> float:
+    chunks = split_text(text)
+    if len(chunks) == 1:
+        return _cached_compound(analyzer, text)
+    # Length-weighted mean of per-chunk compounds keeps the cost linear in total characters
+    total = sum(len(c) for c in chunks)
+    return sum(_cached_compound(analyzer, c) * len(c) for c in chunks) / total
+
+
+# Fast-path tokenizer: lowercase word tokens only (no emoticons or punctuation emphasis)
+_LEXICON_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'_-]*")
+VADER_ALPHA = 15
+
+
+@functools.lru_cache(maxsize=1)
+def _lexicon_index(analyzer: SentimentIntensityAnalyzer) -> Tuple[Dict[str, int], "np.ndarray"]:
+    import numpy as np
+
+    # Token -> row in a valence array; the trailing 0.0 row absorbs out-of-lexicon tokens
+    index = {token: i for i, token in enumerate(analyzer.lexicon)}
+    valences = np.append(np.fromiter(analyzer.lexicon.values(), dtype=np.float64, count=len(index)), 0.0)
+    return index, valences
+
+
+def vader_compound_bulk(analyzer: SentimentIntensityAnalyzer, texts: List[str]) -> "np.ndarray":
+    # Approximate VADER compound for many texts at once: sum raw lexicon valences per text and
+    # apply VADER's normalization. Negation, boosters, "but" clauses and caps/punctuation
+    # emphasis are omitted, so only the compound score (and its label) is meaningful.
+    import numpy as np
+
+    index, valences = _lexicon_index(analyzer)
+    miss = len(index)
+    rows: List[int] = []
+    counts: List[int] = []
+    for text in texts:
+        tokens = _LEXICON_TOKEN_RE.findall(text.lower())
+        rows.extend(index.get(t, miss) for t in tokens)
+        counts.append(len(tokens))
+    owners = np.repeat(np.arange(len(texts)), counts)
+    sums = np.bincount(owners, weights=valences[np.asarray(rows, dtype=np.intp)], minlength=len(texts))
+    return np.clip(sums / np.sqrt(sums * sums + VADER_ALPHA), -1.0, 1.0)
+
+
 def label_from_compound(compound: float) -> str:
     if compound > 0.05:
         return "positive"
@@ -111,18 +228,27 @@ def label_from_compound(compound: float) -> str:
     return "neutral"
 
 
-def analyze_issue_sentiment(analyzer: SentimentIntensityAnalyzer, status_summary: Optional[str], comments_text: str) -> Tuple[float, Dict[str, float]]:
+def analyze_issue_sentiment(
+    analyzer: SentimentIntensityAnalyzer,
+    status_summary: Optional[str],
+    comments_text: str,
+    bulk_scores: Optional[Dict[str, float]] = None,
+) -> Tuple[float, Dict[str, float]]:
     # Weight Status Summary more than comments if both are present
+    # bulk_scores holds precomputed compounds (see vader_compound_bulk) keyed by text
+    if not status_summary and not comments_text:
+        return 0.0, {"compound": 0.0}
+
     weights = []
     scores = []
 
     if status_summary and status_summary.strip():
-        s = analyzer.polarity_scores(status_summary).get("compound", 0.0)
+        s = bulk_scores[status_summary] if bulk_scores is not None else compound_score(analyzer, status_summary)
         scores.append(s)
         weights.append(0.6)
 
     if comments_text and comments_text.strip():
-        s = analyzer.polarity_scores(comments_text).get("compound", 0.0)
+        s = bulk_scores[comments_text] if bulk_scores is not None else compound_score(analyzer, comments_text)
         scores.append(s)
         weights.append(0.4)
 
@@ -135,53 +261,67 @@ def analyze_issue_sentiment(analyzer: SentimentIntensityAnalyzer, status_summary
     return compound, {"compound": compound}
 
 
+RISK_MARKERS = [
+    "risk", "blocked", "blocker", "delay", "slip", "slipped", "regression",
+    "dependency", "dependent", "qa issue", "qe issue", "concern", "problem", "issue"
+]
+POSITIVE_MARKERS = [
+    "landed", "merged", "shipped", "completed", "done", "progress", "on track",
+    "green", "good", "improved", "started", "work has started"
+]
+# One alternation per marker set: a single C-level scan instead of a Python loop of substring checks.
+# No word boundaries, to keep the substring semantics (e.g. "delay" still matches "delayed").
+_RISK_RE = re.compile("|".join(map(re.escape, RISK_MARKERS)), re.IGNORECASE)
+_POSITIVE_RE = re.compile("|".join(map(re.escape, POSITIVE_MARKERS)), re.IGNORECASE)
+
+
 def extract_signals(text: str) -> Dict[str, bool]:
-    t = (text or "").lower()
-    risk_markers = [
-        "risk", "blocked", "blocker", "delay", "slip", "slipped", "regression",
-        "dependency", "dependent", "qa issue", "qe issue", "concern", "problem", "issue"
-    ]
-    positive_markers = [
-        "landed", "merged", "shipped", "completed", "done", "progress", "on track",
-        "green", "good", "improved", "started", "work has started"
-    ]
-    found_risk = any(m in t for m in risk_markers)
-    found_positive = any(m in t for m in positive_markers)
-    return {"risk_flag": found_risk, "positive_flag": found_positive}
+    t = text or ""
+    return {"risk_flag": bool(_RISK_RE.search(t)), "positive_flag": bool(_POSITIVE_RE.search(t))}
+
+
+def format_issue_row(r: Dict) -> str:
+    signals = r["signals"]
+    narrative = "yes" if r["has_recent_narrative"] else "no"
+    return (
+        f"  - {r['key']}: {r['summary']} | {r['status']} ({r['statusCategory']}) | "
+        f"updated {r['updated']} | sentiment {r['sentiment']} ({r['sentiment_score']}) | "
+        f"recent narrative: {narrative} | "
+        f"signals: +{int(signals['positive_flag'])}/-{int(signals['risk_flag'])}"
+    )
 
 
-def build_report(top_issue: Dict, child_issues: List[Dict], issue_to_details: Dict[str, Dict], days: int) -> str:
+def build_report(top_issue: Dict, child_issues: List[Dict], issue_to_details: Dict[str, Dict], days: int, fast_vader: bool = False) -> str:
     analyzer = SentimentIntensityAnalyzer()
 
+    bulk_scores: Optional[Dict[str, float]] = None
+    if fast_vader:
+        texts = list({
+            t
+            for d in issue_to_details.values()
+            for t in (d.get("status_summary_text") or "", d.get("comments_text") or "")
+            if t.strip()
+        })
+        bulk_scores = dict(zip(texts, vader_compound_bulk(analyzer, texts).tolist()))
+
     per_issue_rows = []
     compounds = []
     risk_flags = 0
     positive_flags = 0
 
-    def get_field(issue: Dict, fid: str) -> Optional[str]:
-        fields = issue.get("fields", {})
-        val = fields.get(fid)
-        if isinstance(val, dict) and "value" in val:
-            return val.get("value")
-        if isinstance(val, str):
-            return val
-        return None
-
     # Aggregate across top issue and children
     all_issues = [top_issue] + child_issues
     for issue in all_issues:
         key = issue.get("key")
-        fields = issue.get("fields", {})
-        details = issue_to_details.get(key, {})
-        status = fields.get("status", {}) or {}
-        status_name = status.get("name")
-        status_category = (status.get("statusCategory") or {}).get("name")
+        fields = issue.get("fields") or {}
+        details = issue_to_details.get(key) or {}
+        status = fields.get("status")
+        status_category = status.get("statusCategory") if status else None
 
         status_summary_text = details.get("status_summary_text") or ""
         comments_text = details.get("comments_text") or ""
-        compound, _scores = analyze_issue_sentiment(SentimentIntensityAnalyzer(), status_summary_text, comments_text)
+        compound, _scores = analyze_issue_sentiment(analyzer, status_summary_text, comments_text, bulk_scores)
         compounds.append(compound)
-        label = label_from_compound(compound)
 
         signals = extract_signals(status_summary_text + "\n" + comments_text)
         if signals["risk_flag"]:
@@ -189,14 +329,13 @@ def build_report(top_issue: Dict, child_issues: List[Dict], issue_to_details: Di
         if signals["positive_flag"]:
             positive_flags += 1
 
-        updated = fields.get("updated") or ""
         per_issue_rows.append({
             "key": key,
             "summary": fields.get("summary"),
-            "status": status_name,
-            "statusCategory": status_category,
-            "updated": updated,
-            "sentiment": label,
+            "status": status.get("name") if status else None,
+            "statusCategory": status_category.get("name") if status_category else None,
+            "updated": fields.get("updated") or "",
+            "sentiment": label_from_compound(compound),
             "sentiment_score": round(compound, 3),
             "has_recent_narrative": bool(status_summary_text.strip() or comments_text.strip()),
             "signals": signals
@@ -230,13 +369,7 @@ def build_report(top_issue: Dict, child_issues: List[Dict], issue_to_details: Di
     # Supporting Information
     sup_lines = []
     sup_lines.append("- Epic and in-progress children analyzed over last {} days:".format(days))
-    for r in per_issue_rows:
-        sup_lines.append(
-            f"  - {r['key']}: {r['summary']} | {r['status']} ({r['statusCategory']}) | "
-            f"updated {r['updated']} | sentiment {r['sentiment']} ({r['sentiment_score']}) | "
-            f"recent narrative: {'yes' if r['has_recent_narrative'] else 'no'} | "
-            f"signals: +{int(r['signals']['positive_flag'])}/-{int(r['signals']['risk_flag'])}"
-        )
+    sup_lines.extend(format_issue_row(r) for r in per_issue_rows)
 
     report = []
     report.append("TL;DR")
@@ -259,7 +392,8 @@ def gather_data(
     parent_link_field_id: Optional[str],
     epic_link_field_id: Optional[str],
 ) -> Tuple[Dict, List[Dict], Dict[str, Dict]]:
-    fields = ["summary", "status", "updated"]
+    # "comment" ships recent comments inline, avoiding a /comment call per issue
+    fields = ["summary", "status", "updated", "comment"]
     if status_summary_field_id:
         fields.append(status_summary_field_id)
 
@@ -276,13 +410,11 @@ def gather_data(
     child_issues: List[Dict] = []
     if jql_parts:
         jql = "(" + " OR ".join(jql_parts) + ') AND statusCategory in ("In Progress")'
-        search = client.search_issues(jql=jql, fields=fields, limit=100)
-        child_issues = search.get("issues", [])
+        child_issues = client.search_issues_paged(jql=jql, fields=fields)
     else:
         # Fallback: try linkedIssues function (may be broad)
         jql = f'issue in linkedIssues("{top_key}") AND statusCategory in ("In Progress")'
-        search = client.search_issues(jql=jql, fields=fields, limit=100)
-        child_issues = search.get("issues", [])
+        child_issues = client.search_issues_paged(jql=jql, fields=fields)
 
     # For each issue, collect status summary text and last-week comments
     now = datetime.now(timezone.utc)
@@ -291,8 +423,8 @@ def gather_data(
     def extract_status_summary_text(issue: Dict) -> str:
         if not status_summary_field_id:
             return ""
-        fields_map = issue.get("fields", {})
-        raw_val = fields_map.get(status_summary_field_id)
+        fields_map = issue.get("fields")
+        raw_val = fields_map.get(status_summary_field_id) if fields_map else None
         if isinstance(raw_val, dict) and "value" in raw_val:
             return str(raw_val.get("value") or "")
         if isinstance(raw_val, str):
@@ -300,39 +432,48 @@ def gather_data(
         return ""
 
     keys = [top_issue.get("key")] + [i.get("key") for i in child_issues]
-    details: Dict[str, Dict] = {}
-    for key in keys:
+    # Built once up front; read-only, so safe to share with the fetch threads
+    by_key = {i.get("key"): i for i in child_issues}
+    by_key[top_issue.get("key")] = top_issue
+
+    def fetch(key: str) -> Tuple[str, str, str]:
         # Status Summary
-        if key == top_issue.get("key"):
-            issue = top_issue
-        else:
-            issue = next((i for i in child_issues if i.get("key") == key), None)
+        issue = by_key.get(key)
         status_summary_text = extract_status_summary_text(issue) if issue else ""
 
-        # Comments
+        # Comments: use the inline page, only hitting /comment when Jira truncated it
+        fields_map = issue.get("fields") if issue else None
+        comment_field = fields_map.get("comment") if fields_map else None
+        comments = (comment_field.get("comments") if comment_field else None) or []
+        if comment_field is None or (comment_field.get("total") or 0) > len(comments):
+            # Keep the inline page if the full fetch fails
+            try:
+                comments = client.get_comments(key, limit=200)
+            except Exception:
+                pass
         comments_texts: List[str] = []
-        try:
-            comments = client.get_comments(key, limit=200)
-        except Exception:
-            comments = []
         for c in comments:
             created_raw = c.get("created") or c.get("createdDate")
             if not created_raw:
                 continue
             try:
-                created_dt = iso_to_dt(created_raw)
+                created_dt = parse_iso_datetime(created_raw)
             except Exception:
                 continue
-            if created_dt.tzinfo is None:
-                created_dt = created_dt.replace(tzinfo=timezone.utc)
             if created_dt >= cutoff:
                 body = c.get("body") or ""
                 comments_texts.append(str(body))
 
-        details[key] = {
-            "status_summary_text": status_summary_text or "",
-            "comments_text": "\n".join(comments_texts) if comments_texts else "",
-        }
+        return key, status_summary_text, "\n".join(comments_texts) if comments_texts else ""
+
+    # Overflow comment fetches run concurrently; the work is I/O-bound on Jira round trips
+    details: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=int(os.environ.get("JIRA_WORKERS", "16"))) as ex:
+        for key, status_summary_text, comments_text in ex.map(fetch, keys):
+            details[key] = {
+                "status_summary_text": status_summary_text or "",
+                "comments_text": comments_text,
+            }
 
     return top_issue, child_issues, details
 
@@ -342,6 +483,15 @@ def main():
     parser.add_argument("top_issue_key", help="Top Jira issue key (e.g., XCMSTRAT-1254)")
     parser.add_argument("--days", type=int, default=7, help="Lookback window in days for comments (default: 7)")
     parser.add_argument("--timeout", type=int, default=20, help="HTTP timeout seconds (default: 20)")
+    parser.add_argument(
+        "--fast-vader",
+        action="store_true",
+        help=(
+            "Score with a vectorized lexicon-only approximation of VADER (requires numpy). "
+            "Negation and emphasis rules are skipped, so negated text can get the opposite label "
+            '(e.g. "This is not good" scores positive)'
+        ),
+    )
     args = parser.parse_args()
 
     try:
@@ -350,7 +500,14 @@ def main():
         print(f"Configuration error: {e}", file=sys.stderr)
         sys.exit(2)
 
-    client = JiraClient(base_url, email, token, api_version=api_version, timeout_seconds=args.timeout)
+    client = JiraClient(
+        base_url,
+        email,
+        token,
+        api_version=api_version,
+        timeout_seconds=args.timeout,
+        http_cache=os.environ.get("JIRA_HTTP_CACHE"),
+    )
 
     # Discover fields
     try:
@@ -364,12 +521,13 @@ def main():
     parent_link_field_id = os.environ.get("JIRA_PARENT_LINK_FIELD_ID")
     epic_link_field_id = os.environ.get("JIRA_EPIC_LINK_FIELD_ID")
 
+    fields_by_name = index_fields_by_name(fields)
     if not status_summary_field_id:
-        status_summary_field_id = find_field_id(fields, ["Status Summary", "Latest Status Summary"])
+        status_summary_field_id = find_field_id(fields_by_name, ["Status Summary", "Latest Status Summary"])
     if not parent_link_field_id:
-        parent_link_field_id = find_field_id(fields, ["Parent Link"])
+        parent_link_field_id = find_field_id(fields_by_name, ["Parent Link"])
     if not epic_link_field_id:
-        epic_link_field_id = find_field_id(fields, ["Epic Link"])
+        epic_link_field_id = find_field_id(fields_by_name, ["Epic Link"])
 
     try:
         top_issue, child_issues, issue_to_details = gather_data(
@@ -385,7 +543,7 @@ def main():
         sys.exit(2)
 
     try:
-        report = build_report(top_issue, child_issues, issue_to_details, days=args.days)
+        report = build_report(top_issue, child_issues, issue_to_details, days=args.days, fast_vader=args.fast_vader)
     except Exception as e:
         print(f"Failed to build report: {e}", file=sys.stderr)
         sys.exit(2)
@@ -5,103 +5,194 @@ import sys
 import time
 import json
 import math
-import base64
+import re
+import functools
+import hashlib
 import datetime as dt
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Dict, List, Tuple, Any, Optional
 
+import msgspec
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from nltk import __version__ as NLTK_VERSION
 from nltk.sentiment import SentimentIntensityAnalyzer
 
+from vader_support import parse_iso_datetime, persisted_polarity_scores, split_text
+
 JIRA_BASE_URL = os.getenv("JIRA_BASE_URL", "").rstrip("/")
 JIRA_EMAIL = os.getenv("JIRA_EMAIL", "")
 JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN", "")
-
-SESSION = requests.Session()
+JIRA_WORKERS = int(os.getenv("JIRA_WORKERS", "16"))
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", str(os.cpu_count() or 1)))
+# Below this many issues, process start-up costs more than the scoring it saves
+SENTIMENT_POOL_MIN_ISSUES = 16
+# Optional on-disk HTTP cache for GETs, e.g. ~/.cache/jira_http; disabled when unset
+JIRA_HTTP_CACHE = os.path.expanduser(os.getenv("JIRA_HTTP_CACHE", ""))
+
+def _new_session() -> requests.Session:
+    if not JIRA_HTTP_CACHE:
+        return requests.Session()
+    try:
+        import requests_cache
+    except ImportError:
+        print("Warn: JIRA_HTTP_CACHE is set but requests-cache is not installed; caching disabled", file=sys.stderr)
+        return requests.Session()
+    # Jira sends Cache-Control: no-store, so ignore it and let expire_after decide;
+    # stale entries are revalidated with ETag, so unchanged issues come back as 304s
+    return requests_cache.CachedSession(
+        cache_name=JIRA_HTTP_CACHE,
+        backend="sqlite",
+        expire_after=dt.timedelta(hours=1),
+        cache_control=False,
+        allowable_methods=("GET",),
+    )
+
+SESSION = _new_session()
+SESSION.auth = (JIRA_EMAIL, JIRA_API_TOKEN)
 SESSION.headers.update({
     "Accept": "application/json",
-    "Content-Type": "application/json"
 })
-
-def _auth_header() -> Dict[str, str]:
-    token = base64.b64encode(f"{JIRA_EMAIL}:{JIRA_API_TOKEN}".encode()).decode()
-    return {"Authorization": f"Basic {token}"}
-
-def _get(url: str, params: Dict[str, Any] = None) -> Any:
-    resp = SESSION.get(url, headers=_auth_header(), params=params or {})
+# Size the pool for the concurrent per-issue analysis in main, and retry throttling/transient errors
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+def _get(url: str, params: Dict[str, Any] = None, as_type: Optional[type] = None) -> Any:
+    resp = SESSION.get(url, params=params or {})
     resp.raise_for_status()
-    return resp.json()
-
-def _post(url: str, payload: Dict[str, Any]) -> Any:
-    resp = SESSION.post(url, headers=_auth_header(), data=json.dumps(payload))
-    resp.raise_for_status()
-    return resp.json()
+    if as_type is not None:
+        return msgspec.json.decode(resp.content, type=as_type)
+    return orjson.loads(resp.content)
+
+@functools.lru_cache(maxsize=1)
+def _all_fields() -> List[Dict[str, Any]]:
+    # /field is large on mature instances and doesn't change within a run; fetch it once
+    return _get(f"{JIRA_BASE_URL}/rest/api/2/field")
+
+@functools.lru_cache(maxsize=1)
+def _field_ids_by_name() -> Dict[str, str]:
+    by_name: Dict[str, str] = {}
+    for f in _all_fields():
+        by_name.setdefault(f.get("name", "").lower(), f.get("id"))
+    return by_name
 
 def jira_search_fields(keyword: str = "", limit: int = 200) -> List[Dict[str, Any]]:
-    url = f"{JIRA_BASE_URL}/rest/api/2/field"
-    fields = _get(url)
+    fields = _all_fields()
     if not keyword:
         return fields[:limit]
     keyword_lower = keyword.lower()
     return [f for f in fields if keyword_lower in f.get("name", "").lower()][:limit]
 
 def find_field_id_by_name(name: str) -> Optional[str]:
-    for f in jira_search_fields(name, limit=500):
-        if f.get("name", "").lower() == name.lower():
-            return f.get("id")
-    return None
+    return _field_ids_by_name().get(name.lower())
 
 def jira_search_jql(jql: str, fields: List[str], limit: int = 50) -> List[Dict[str, Any]]:
     url = f"{JIRA_BASE_URL}/rest/api/2/search"
     start_at = 0
     results: List[Dict[str, Any]] = []
-    while True:
-        payload = {
+    while len(results) < limit:
+        # GET (rather than POST) /search so responses can be served from the HTTP cache
+        params = {
             "jql": jql,
             "startAt": start_at,
-            "maxResults": min(50, limit - len(results)),
-            "fields": fields
+            # 100 is Jira's per-page cap for /search
+            "maxResults": min(100, limit - len(results)),
+            "fields": ",".join(fields)
         }
-        if payload["maxResults"] <= 0:
-            break
-        data = _post(url, payload)
+        data = _get(url, params)
         issues = data.get("issues", [])
         results.extend(issues)
-        if len(issues) == 0 or len(results) >= limit:
+        # Advance from the server's startAt, not our own counter, so short pages don't skip issues
+        start_at = data.get("startAt", start_at) + len(issues)
+        if len(issues) == 0 or data.get("isLast") or start_at >= data.get("total", 0):
             break
-        start_at += len(issues)
-    return results
-
-def jira_get_issue(key: str, fields: List[str]) -> Dict[str, Any]:
+    return results[:limit]
+
+# Typed shapes for the per-issue fetch: the response is validated once at decode time,
+# so fetch_issue reads attributes instead of re-checking dict shapes on every access
+class JiraNamed(msgspec.Struct):
+    name: Optional[str] = None
+
+class JiraUser(msgspec.Struct):
+    displayName: Optional[str] = None
+
+class JiraCommentPage(msgspec.Struct):
+    comments: List[Dict[str, Any]] = []
+    total: int = 0
+
+# Custom fields can hold anything (option objects, strings, numbers, arrays...), so they are
+# left untyped and normalized by custom_field_text rather than failing the whole issue decode
+CustomFieldValue = Any
+
+@functools.lru_cache(maxsize=None)
+def issue_struct(*custom_field_ids: str) -> type:
+    # Custom field ids are only known at runtime, so the fields struct is built per id set
+    fields_type = msgspec.defstruct(
+        "JiraIssueFields",
+        [
+            ("summary", Optional[str], None),
+            ("status", Optional[JiraNamed], None),
+            ("priority", Optional[JiraNamed], None),
+            ("assignee", Optional[JiraUser], None),
+            ("comment", Optional[JiraCommentPage], None),
+        ] + [(fid, CustomFieldValue, None) for fid in custom_field_ids],
+    )
+    return msgspec.defstruct(
+        "JiraIssue",
+        [("key", str, ""), ("fields", fields_type, msgspec.field(default_factory=fields_type))],
+    )
+
+def custom_field_text(val: CustomFieldValue) -> str:
+    if not val:
+        return ""
+    if isinstance(val, dict) and "value" in val:
+        return str(val.get("value") or "")
+    return str(val).strip()
+
+def jira_get_issue(key: str, fields: List[str], as_type: Optional[type] = None) -> Any:
     url = f"{JIRA_BASE_URL}/rest/api/2/issue/{key}"
     params = {"fields": ",".join(fields)}
-    return _get(url, params)
+    return _get(url, params, as_type=as_type)
 
 def jira_get_all_comments(key: str, max_comments: int = 200) -> List[Dict[str, Any]]:
     url = f"{JIRA_BASE_URL}/rest/api/2/issue/{key}/comment"
     start_at = 0
     results: List[Dict[str, Any]] = []
-    while True:
-        params = {"startAt": start_at, "maxResults": min(50, max_comments - len(results))}
+    while len(results) < max_comments:
+        params = {"startAt": start_at, "maxResults": min(100, max_comments - len(results))}
         data = _get(url, params)
         comments = data.get("comments", [])
         results.extend(comments)
-        if len(comments) == 0 or len(results) >= max_comments:
+        # Stop on total rather than waiting for an empty page, saving a round trip per issue
+        start_at = data.get("startAt", start_at) + len(comments)
+        if len(comments) == 0 or data.get("isLast") or start_at >= data.get("total", 0):
             break
-        start_at += len(comments)
-    return results
+    return results[:max_comments]
 
 def collect_in_progress_descendants(root_key: str, parent_link_field: str, max_depth: int = 3) -> List[str]:
     # BFS over "Parent Link" relationships, statuscategory = In Progress
     in_progress_clause = 'statuscategory in ("In Progress")'
     seen: set = set([root_key])
-    frontier: List[Tuple[str, int]] = [(root_key, 0)]
+    frontier: deque = deque([(root_key, 0)])
     all_keys: List[str] = [root_key]
     while frontier:
-        current, depth = frontier.pop(0)
+        depth = frontier[0][1]
         if depth >= max_depth:
-            continue
-        jql = f'"{parent_link_field}" = {current} AND {in_progress_clause}'
-        for issue in jira_search_jql(jql, fields=["key"], limit=200):
+            break
+        # Query up to 100 parents of the same level in one JQL "in" clause instead of one search each
+        parents: List[str] = []
+        while frontier and frontier[0][1] == depth and len(parents) < 100:
+            parents.append(frontier.popleft()[0])
+        jql = f'"{parent_link_field}" in ({", ".join(parents)}) AND {in_progress_clause}'
+        for issue in jira_search_jql(jql, fields=["key"], limit=200 * len(parents)):
             key = issue.get("key")
             if key and key not in seen:
                 seen.add(key)
@@ -110,27 +201,24 @@ def collect_in_progress_descendants(root_key: str, parent_link_field: str, max_d
     return all_keys
 
 def filter_comments_last_days(comments: List[Dict[str, Any]], days: int) -> List[Dict[str, Any]]:
-    cutoff = dt.datetime.utcnow() - dt.timedelta(days=days)
+    cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=days)
     filtered = []
     for c in comments:
         created_str = c.get("created")
         if not created_str:
             continue
-        # Jira timestamps are ISO 8601 with timezone, parse minimally
-        # Example: "2025-09-09T16:15:41.918+0000"
         try:
-            created = dt.datetime.strptime(created_str[:23] + "+0000", "%Y-%m-%dT%H:%M:%S.%f+0000")
-        except Exception:
-            try:
-                created = dt.datetime.strptime(created_str, "%Y-%m-%dT%H:%M:%S.%f%z").astimezone(dt.timezone.utc).replace(tzinfo=None)
-            except Exception:
-                continue
+            created = parse_iso_datetime(created_str)
+        except ValueError:
+            continue
         if created >= cutoff:
             filtered.append(c)
     return filtered
 
+@functools.lru_cache(maxsize=1)
 def init_vader() -> SentimentIntensityAnalyzer:
     # Ensure VADER lexicon is present (nltk auto-download can be added if needed)
+    # Cached: loading the lexicon is the expensive part, so build one analyzer per process
     from nltk import download
     try:
         SentimentIntensityAnalyzer()
@@ -138,10 +226,41 @@ def init_vader() -> SentimentIntensityAnalyzer:
         download("vader_lexicon")
     return SentimentIntensityAnalyzer()
 
+@functools.lru_cache(maxsize=1)
+def score_cache_version(sia: SentimentIntensityAnalyzer) -> str:
+    # nltk's VADER lexicon is downloaded separately from nltk itself, so key on its contents too
+    lexicon = getattr(sia, "lexicon_file", "") or ""
+    return f"nltk-{NLTK_VERSION}-{hashlib.blake2b(lexicon.encode(), digest_size=8).hexdigest()}"
+
+@functools.lru_cache(maxsize=4096)
+def _polarity_scores(sia: SentimentIntensityAnalyzer, text: str) -> Dict[str, float]:
+    # Duplicate texts (bot comments, cross-posted summaries) are scored once per process,
+    # and once per scorer version across runs when the on-disk cache is enabled
+    return persisted_polarity_scores(score_cache_version(sia), text, sia.polarity_scores)
+
+ZERO_SCORES = {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0}
+
+def weighted_scores(parts: List[Tuple[Dict[str, float], int]]) -> Dict[str, float]:
+    # Mean of VADER score dicts weighted by text length; empty parts carry no weight
+    total = sum(w for _scores, w in parts)
+    if not total:
+        return dict(ZERO_SCORES)
+    agg = {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+    for scores, w in parts:
+        for k in agg:
+            agg[k] += scores[k] * w / total
+    return agg
+
 def score_text(sia: SentimentIntensityAnalyzer, text: str) -> Dict[str, float]:
-    if not text.strip():
-        return {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0}
-    return sia.polarity_scores(text)
+    # Empty Status Summary fields are common; skip VADER (and the strip) for them entirely
+    if not text or not text.strip():
+        return dict(ZERO_SCORES)
+    chunks = split_text(text)
+    if len(chunks) == 1:
+        # Copy so callers never mutate a cached entry
+        return dict(_polarity_scores(sia, text))
+    # Length-weighted mean of per-chunk scores keeps the cost linear in total characters
+    return weighted_scores([(_polarity_scores(sia, c), len(c)) for c in chunks])
 
 def label_from_compound(compound: float) -> str:
     if compound >= 0.2:
@@ -150,54 +269,35 @@ def label_from_compound(compound: float) -> str:
         return "negative"
     return "neutral"
 
+RISK_KEYWORDS = ["slip", "slipped", "delay", "delayed", "blocked", "overdue", "push", "pushed", "won't meet", "risk"]
+# Single alternation scanned once in C; substring semantics kept (no word boundaries)
+_RISK_RE = re.compile("|".join(map(re.escape, RISK_KEYWORDS)), re.IGNORECASE)
+
 def has_risk_keywords(text: str) -> bool:
-    t = text.lower()
-    keywords = ["slip", "slipped", "delay", "delayed", "blocked", "overdue", "push", "pushed", "won't meet", "risk"]
-    return any(k in t for k in keywords)
-
-def analyze_issue(key: str, field_status_summary: Optional[str], field_latest_status_summary: Optional[str], days: int, sia: SentimentIntensityAnalyzer) -> Dict[str, Any]:
-    fields = ["summary", "status", "priority", "assignee"]
-    if field_status_summary:
-        fields.append(field_status_summary)
-    if field_latest_status_summary:
-        fields.append(field_latest_status_summary)
-    issue = jira_get_issue(key, fields)
-    f = issue.get("fields", {})
-    summary = f.get("summary")
-    status = (f.get("status") or {}).get("name")
-    priority = (f.get("priority") or {}).get("name")
-    assignee = ((f.get("assignee") or {}).get("displayName")) or "Unassigned"
-
-    ss_text = ""
-    if field_status_summary and f.get(field_status_summary):
-        # Custom fields may return scalar or object; normalize to string
-        val = f.get(field_status_summary)
-        if isinstance(val, dict) and "value" in val:
-            ss_text = (val.get("value") or "") or ""
-        else:
-            ss_text = str(val or "").strip()
-
-    lss_text = ""
-    if field_latest_status_summary and f.get(field_latest_status_summary):
-        val = f.get(field_latest_status_summary)
-        if isinstance(val, dict) and "value" in val:
-            lss_text = (val.get("value") or "") or ""
-        else:
-            lss_text = str(val or "").strip()
-
-    comments = jira_get_all_comments(key, max_comments=200)
+    return _RISK_RE.search(text) is not None
+
+def fetch_issue(key: str, field_status_summary: Optional[str], field_latest_status_summary: Optional[str], days: int) -> Tuple[Dict[str, Any], Tuple[str, str, str]]:
+    custom_field_ids = list(dict.fromkeys(fid for fid in (field_status_summary, field_latest_status_summary) if fid))
+    # "comment" ships comments inline, so /comment is only needed when Jira truncates them
+    fields = ["summary", "status", "priority", "assignee", "comment"] + custom_field_ids
+    issue = jira_get_issue(key, fields, as_type=issue_struct(*custom_field_ids))
+    f = issue.fields
+    summary = f.summary
+    status = f.status.name if f.status else None
+    priority = f.priority.name if f.priority else None
+    assignee = (f.assignee.displayName if f.assignee else None) or "Unassigned"
+
+    ss_text = custom_field_text(getattr(f, field_status_summary)) if field_status_summary else ""
+    lss_text = custom_field_text(getattr(f, field_latest_status_summary)) if field_latest_status_summary else ""
+
+    comment_page = f.comment
+    comments = comment_page.comments if comment_page else []
+    if comment_page is None or comment_page.total > len(comments):
+        comments = jira_get_all_comments(key, max_comments=200)
     recent_comments = filter_comments_last_days(comments, days)
     comments_text = "\n".join([c.get("body") or "" for c in recent_comments])
 
-    combined_text = "\n".join([ss_text, lss_text, comments_text]).strip()
-    s_ss = score_text(sia, ss_text)
-    s_cmts = score_text(sia, comments_text)
-    s_all = score_text(sia, combined_text)
-
-    risk = has_risk_keywords(combined_text)
-    label = label_from_compound(s_all.get("compound", 0.0))
-
-    return {
+    record = {
         "key": key,
         "summary": summary,
         "status": status,
@@ -206,15 +306,47 @@ def analyze_issue(key: str, field_status_summary: Optional[str], field_latest_st
         "status_summary": ss_text or None,
         "latest_status_summary": lss_text or None,
         "recent_comments_count": len(recent_comments),
-        "sentiment": {
-            "status_summary": s_ss,
-            "comments_last_week": s_cmts,
-            "combined": s_all,
-            "label": label,
-            "risk_keywords": risk
+    }
+    return record, (ss_text, lss_text, comments_text)
+
+def score_issue(sia: SentimentIntensityAnalyzer, ss_text: str, lss_text: str, comments_text: str) -> Dict[str, Any]:
+    if not (ss_text or lss_text or comments_text):
+        return {
+            "status_summary": dict(ZERO_SCORES),
+            "comments_last_week": dict(ZERO_SCORES),
+            "combined": dict(ZERO_SCORES),
+            "label": label_from_compound(0.0),
+            "risk_keywords": False
         }
+    s_ss = score_text(sia, ss_text)
+    s_lss = score_text(sia, lss_text)
+    s_cmts = score_text(sia, comments_text)
+    # Approximation: the combined score is the length-weighted mean of the parts instead of a
+    # third VADER pass over their concatenation; the parts are independent narratives, so
+    # rule interactions across the join are negligible
+    s_all = weighted_scores([(s_ss, len(ss_text)), (s_lss, len(lss_text)), (s_cmts, len(comments_text))])
+
+    # No keyword contains a newline, so checking each part equals checking the joined text
+    risk = any(has_risk_keywords(t) for t in (ss_text, lss_text, comments_text) if t)
+    label = label_from_compound(s_all.get("compound", 0.0))
+
+    return {
+        "status_summary": s_ss,
+        "comments_last_week": s_cmts,
+        "combined": s_all,
+        "label": label,
+        "risk_keywords": risk
     }
 
+def _score_triplet(item: Tuple[str, str, str, str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    # Runs in a worker process (or inline for small runs); init_vader is cached, so each process loads the lexicon once
+    key, ss_text, lss_text, comments_text = item
+    try:
+        return key, score_issue(init_vader(), ss_text, lss_text, comments_text)
+    except Exception as e:
+        print(f"Warn: failed to score {key}: {e}", file=sys.stderr)
+        return key, None
+
 def build_exec_summary(analyses: List[Dict[str, Any]]) -> str:
     if not analyses:
         return "No in-progress issues found; no sentiment to report."
@@ -266,18 +398,43 @@ def main():
 
     in_progress_keys = collect_in_progress_descendants(root_key, parent_link_field_id, max_depth=4)
 
-    sia = init_vader()
-    analyses: List[Dict[str, Any]] = []
-    for key in in_progress_keys:
+    # Load the lexicon up front so a broken VADER install fails before any Jira calls
+    init_vader()
+
+    def fetch(key: str) -> Optional[Tuple[Dict[str, Any], Tuple[str, str, str]]]:
         try:
-            a = analyze_issue(key, status_summary_field_id, latest_status_summary_field_id, days, sia)
-            # Only include truly in-progress issues (root included regardless)
-            if key == root_key or (a.get("status") == "In Progress"):
-                analyses.append(a)
+            return fetch_issue(key, status_summary_field_id, latest_status_summary_field_id, days)
         except requests.HTTPError as e:
             print(f"Warn: failed to analyze {key}: {e}", file=sys.stderr)
         except Exception as e:
             print(f"Warn: unexpected error on {key}: {e}", file=sys.stderr)
+        return None
+
+    # Issues are fetched concurrently; results keep the BFS order of in_progress_keys
+    fetched: List[Tuple[Dict[str, Any], Tuple[str, str, str]]] = []
+    with ThreadPoolExecutor(max_workers=JIRA_WORKERS) as ex:
+        for key, res in zip(in_progress_keys, ex.map(fetch, in_progress_keys)):
+            if res is None:
+                continue
+            # Only include truly in-progress issues (root included regardless)
+            if key == root_key or (res[0].get("status") == "In Progress"):
+                fetched.append(res)
+
+    # VADER scoring is CPU-bound pure Python, so fan it out across processes
+    items = [(record["key"], *texts) for record, texts in fetched]
+    if SENTIMENT_WORKERS > 1 and len(items) >= SENTIMENT_POOL_MIN_ISSUES:
+        with ProcessPoolExecutor(max_workers=SENTIMENT_WORKERS) as ex:
+            scores = dict(ex.map(_score_triplet, items, chunksize=4))
+    else:
+        scores = dict(map(_score_triplet, items))
+
+    analyses: List[Dict[str, Any]] = []
+    for record, _texts in fetched:
+        sentiment = scores[record["key"]]
+        if sentiment is None:
+            continue
+        record["sentiment"] = sentiment
+        analyses.append(record)
 
     # Print per-issue results
     print(json.dumps({"issues": analyses}, indent=2))
@@ -0,0 +1,98 @@
+# file: vader_support.py
+# Helpers shared by jira_sentiment.py and sentiment_exec_summary.py
+import hashlib
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+# Optional persistent score cache, e.g. ~/.cache/jira_sentiment.db; disabled when unset.
+# Rows are keyed by a scorer version string, so each script must namespace its own.
+SENTIMENT_CACHE_DB = os.path.expanduser(os.environ.get("SENTIMENT_CACHE_DB", ""))
+
+# VADER slows down super-linearly on long (emoji-heavy) inputs, so cap the text per call
+VADER_MAX_CHARS = 4096
+
+_score_db: Optional[sqlite3.Connection] = None
+_score_db_failed = False
+
+
+def _disable_score_db(e: Exception) -> None:
+    # Warn once per process and score without the cache from then on
+    global _score_db, _score_db_failed
+    if not _score_db_failed:
+        print(f"Warning: sentiment cache {SENTIMENT_CACHE_DB} unavailable, scoring without it: {e}", file=sys.stderr)
+    _score_db_failed = True
+    _score_db = None
+
+
+def _open_score_db() -> Optional[sqlite3.Connection]:
+    # Opened lazily so each scoring process gets its own connection
+    global _score_db
+    if _score_db is None and SENTIMENT_CACHE_DB and not _score_db_failed:
+        try:
+            os.makedirs(os.path.dirname(SENTIMENT_CACHE_DB) or ".", exist_ok=True)
+            conn = sqlite3.connect(SENTIMENT_CACHE_DB)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                "version TEXT, h BLOB, compound REAL, neg REAL, neu REAL, pos REAL, PRIMARY KEY (version, h))"
+            )
+        except (sqlite3.Error, OSError) as e:
+            _disable_score_db(e)
+            return None
+        _score_db = conn
+    return _score_db
+
+
+def persisted_polarity_scores(version: str, text: str, polarity_scores: Callable[[str], Dict[str, float]]) -> Dict[str, float]:
+    db = _open_score_db()
+    if db is None:
+        return polarity_scores(text)
+    h = hashlib.blake2b(text.encode(), digest_size=16).digest()
+    try:
+        row = db.execute("SELECT compound, neg, neu, pos FROM scores WHERE version = ? AND h = ?", (version, h)).fetchone()
+    except sqlite3.Error as e:
+        _disable_score_db(e)
+        return polarity_scores(text)
+    if row:
+        return {"neg": row[1], "neu": row[2], "pos": row[3], "compound": row[0]}
+    scores = polarity_scores(text)
+    try:
+        with db:
+            db.execute(
+                "INSERT OR IGNORE INTO scores (version, h, compound, neg, neu, pos) VALUES (?, ?, ?, ?, ?, ?)",
+                (version, h, scores["compound"], scores["neg"], scores["neu"], scores["pos"]),
+            )
+    except sqlite3.Error as e:
+        # Typically "database is locked" while other pool workers write; the score itself is fine
+        _disable_score_db(e)
+    return scores
+
+
+def split_text(text: str, max_chars: int = VADER_MAX_CHARS) -> List[str]:
+    # Prefer line breaks (comments are newline-joined) so chunks stay whole comments where possible
+    chunks = []
+    while len(text) > max_chars:
+        cut = text.rfind("\n", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        chunks.append(text[:cut])
+        text = text[cut:]
+    chunks.append(text)
+    return chunks
+
+
+def parse_iso_datetime(s: str) -> datetime:
+    # Jira timestamps look like "2025-09-09T16:15:41.918+0000"; normalize "Z"/"+HHMM" offsets
+    # so the C-implemented fromisoformat accepts them on older Pythons, and treat naive values as UTC.
+    # Only strings with a time part can carry an offset, so date-only values pass through untouched.
+    if "T" in s:
+        if s.endswith("Z"):
+            s = s[:-1] + "+00:00"
+        elif len(s) >= 5 and s[-5] in "+-" and s[-3] != ":":
+            s = s[:-2] + ":" + s[-2:]
+    parsed = datetime.fromisoformat(s)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed